@@ -1,45 +1,96 @@
 # Turn retrieved passages into short, citable "claims" WITHOUT an LLM.
-from typing import List, Dict
+# Sentence boundaries are computed once at ingest (claim_candidates -> payload),
+# so at request time we only slice the stored spans and dedupe by hash.
+from typing import List, Dict, Tuple, Iterator
+import hashlib
 import re
+from itertools import chain
 
-def _first_sentences(text: str, max_sents: int = 2) -> List[str]:
+CLAIM_SENTS = 2  # candidate sentences kept per chunk
+
+_SENT_BREAK = re.compile(r"(?<=[\.\?\!])\s+")
+
+def _sentence_spans(text: str, max_sents: int = CLAIM_SENTS) -> List[Tuple[int, int]]:
     """
     Sentence splitter: split on . ? !
-    Returns up to max_sents non-empty fragments.
+    Returns up to max_sents (start, end) offsets into text, whitespace-trimmed and non-empty.
+    """
+    out: List[Tuple[int, int]] = []
+    start = 0
+    # lazily: stop scanning once max_sents sentences are found
+    breaks = chain(((m.start(), m.end()) for m in _SENT_BREAK.finditer(text)), [(len(text), len(text))])
+    for end, nxt in breaks:
+        s, e = start, end
+        start = nxt
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if s < e:
+            out.append((s, e))
+            if len(out) >= max_sents:
+                break
+    return out
+
+def _claim_hash(claim: str) -> str:
+    return hashlib.blake2b(claim.encode("utf-8"), digest_size=8).hexdigest()
+
+def claim_candidates(text: str) -> Dict:
+    """
+    Precompute claim candidates for a chunk (called at ingest; stored in the payload):
+      {"claim_spans": [[start, end], ...], "claim_hashes": ["<16 hex>", ...]}
+    Spans index into the chunk's stored 'text'.
     """
-    parts = re.split(r"(?<=[\.\?\!])\s+", text.strip())
-    parts = [p.strip() for p in parts if p.strip()]
-    return parts[:max_sents] or ([text.strip()] if text.strip() else [])
+    spans = _sentence_spans(text)
+    return {
+        "claim_spans": [[s, e] for s, e in spans],
+        "claim_hashes": [_claim_hash(text[s:e]) for s, e in spans],
+    }
+
+def _valid_span(sp, text: str) -> bool:
+    """A stored span is a [start, end] pair of ints selecting non-blank text."""
+    if not (isinstance(sp, (list, tuple)) and len(sp) == 2 and all(isinstance(x, int) for x in sp)):
+        return False
+    s, e = sp
+    return 0 <= s < e <= len(text) and not text[s:e].isspace()
+
+def _passage_claims(p: Dict) -> Iterator[Tuple[str, str]]:
+    """Yield (claim, hash) for a passage, from precomputed spans when the payload has them."""
+    text = p.get("text", "")
+    spans, hashes = p.get("claim_spans"), p.get("claim_hashes")
+    if (not isinstance(spans, list) or not isinstance(hashes, list) or len(spans) != len(hashes)
+            or not all(_valid_span(sp, text) for sp in spans)):
+        # Legacy payload (ingested before candidates were stored), or spans that no
+        # longer fit the text (e.g. re-cleaned after ingest): split now
+        cand = claim_candidates(text)
+        spans, hashes = cand["claim_spans"], cand["claim_hashes"]
+    for (s, e), h in zip(spans, hashes):
+        yield text[s:e], h
 
 async def extract_claims(question: str, passages: List[Dict], max_claims: int = 8) -> List[Dict]:
     """
     Build atomic, citable claims from the top passages:
-      - take the first 1–2 sentences from each passage
-      - trim & dedupe
+      - take the first 1–2 sentences from each passage (precomputed at ingest)
+      - dedupe by sentence hash
     Output: [{"claim","arxiv_id","section"}]
     """
     claims: List[Dict] = []
     seen = set()
 
     for p in passages:
-        for sent in _first_sentences(p.get("text", ""), max_sents=2):
-            claim = sent.strip()
-            if not claim:
-                continue
-            key = (claim, p.get("arxiv_id", ""), p.get("section", ""))
+        arxiv_id, section = p.get("arxiv_id", ""), p.get("section", "")
+        for claim, h in _passage_claims(p):
+            key = (h, arxiv_id, section)
             if key in seen:
                 continue
             seen.add(key)
             claims.append(
                 {
                     "claim": claim,
-                    "arxiv_id": p.get("arxiv_id", ""),
-                    "section": p.get("section", ""),
+                    "arxiv_id": arxiv_id,
+                    "section": section,
                 }
             )
             if len(claims) >= max_claims:
                 return claims
     return claims
-
-
-
@@ -7,8 +7,13 @@ def connect() -> QdrantClient:
     """Create a Qdrant client from settings.
     - For local Docker: QDRANT_URL=http://localhost:6333
     - for cloud: use QdrantClient(url=..., api_key=...)
+    - QDRANT_PREFER_GRPC=true switches to gRPC on QDRANT_GRPC_PORT (faster bulk uploads)
     """
-    return QdrantClient(url=settings.QDRANT_URL)
+    return QdrantClient(
+        url=settings.QDRANT_URL,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+    )
 
 def ensure_collection(client: QdrantClient) -> None:
     from embedder import EMBED_DIM  # re-read on each call in case backend/model changed
@@ -1,5 +1,7 @@
 # embedder.py  -- dual backend: 'onnx' (local) or 'openai')
-from typing import List
+# Both backends return List[List[float]] by default; pass as_numpy=True to get a
+# (N, EMBED_DIM) float32 array instead (used by bulk ingest to skip .tolist()).
+from typing import List, Union
 import os
 import numpy as np
 
@@ -22,15 +24,17 @@ if BACKEND == "openai":
         )
     _client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
-    def embed_texts(texts: List[str]) -> List[List[float]]:
+    def embed_texts(texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         """Embed document/passages (OpenAI models apparently do not require a 'passage:' prefix)."""
         resp = _client.embeddings.create(model=EMBED_MODEL, input=texts)
-        return [d.embedding for d in resp.data]
+        vecs = [d.embedding for d in resp.data]
+        return np.asarray(vecs, dtype=np.float32) if as_numpy else vecs
 
-    def embed_queries(texts: List[str]) -> List[List[float]]:
+    def embed_queries(texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         """Keep the API uniform: for OpenAI we just call the same endpoint."""
         resp = _client.embeddings.create(model=EMBED_MODEL, input=texts)
-        return [d.embedding for d in resp.data]
+        vecs = [d.embedding for d in resp.data]
+        return np.asarray(vecs, dtype=np.float32) if as_numpy else vecs
 
 # -----------------------------
 # Backend B: ONNX (local, CPU)
@@ -85,8 +89,10 @@ else:
         counts = np.clip(mask.sum(axis=1), 1e-9, None)                     # (B,1)
         return summed / counts
 
-    def _run_onnx(batch_texts: List[str]) -> List[List[float]]:
-        """Tokenide -> ONNX forward -> (optional) mean-pool -> L2 normalise."""
+    def _run_onnx(batch_texts: List[str]) -> np.ndarray:
+        """Tokenide -> ONNX forward -> (optional) mean-pool -> L2 normalise.
+        Returns a (B, EMBED_DIM) float32 array.
+        """
         enc = _tok(
             batch_texts,
             padding=True,
@@ -103,24 +109,26 @@ else:
         pooled = _mean_pool(first, enc["attention_mask"]) if first.ndim == 3 else first
         norms = np.linalg.norm(pooled, axis=1, keepdims=True)
         pooled = pooled / np.clip(norms, 1e-12, None)
-        return pooled.astype(np.float32).tolist()
+        return pooled.astype(np.float32, copy=False)
 
-    def _batch_map(texts: List[str], prefix: str) -> List[List[float]]:
-        """Apply BGE-M3's required prefix and batch through ONNX."""
-        out: List[List[float]] = []
+    def _batch_map(texts: List[str], prefix: str) -> np.ndarray:
+        """Apply BGE-M3's required prefix and batch through ONNX into one preallocated array."""
+        out = np.empty((len(texts), EMBED_DIM), dtype=np.float32)
         B = 64
         for i in range(0, len(texts), B):
             batch = [(prefix + t.strip()) for t in texts[i:i + B]]
-            out.extend(_run_onnx(batch))
+            out[i:i + len(batch)] = _run_onnx(batch)
         return out
 
-    def embed_texts(texts: List[str]) -> List[List[float]]:
+    def embed_texts(texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         """Embed passages/chunks. BGE-M3 expects a 'passage: ' prefix."""
-        return _batch_map(texts, "passage: ")
+        vecs = _batch_map(texts, "passage: ")
+        return vecs if as_numpy else vecs.tolist()
 
-    def embed_queries(texts: List[str]) -> List[List[float]]:
+    def embed_queries(texts: List[str], as_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         """Embed queries. BGE-M3 expects a 'query: ' prefix."""
-        return _batch_map(texts, "query: ")
+        vecs = _batch_map(texts, "query: ")
+        return vecs if as_numpy else vecs.tolist()
 
 
 
@@ -2,11 +2,13 @@
 import time
 import uuid 
 import requests
-from typing import List
-from qdrant_client.models import PointStruct 
+from itertools import tee
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 from settings import settings
 from db_qdrant import connect, ensure_collection
 from embedder import embed_texts
+from claims import claim_candidates
 from html_parse import fetch_ar5iv_html, html_to_sections, chunk_text, AR5IV_BASE
 import re
 
@@ -67,11 +69,9 @@ def list_recent_arxiv_ids(max_results: int = 50) -> List[str]:
     return out
 
 
-def run(max_results: int = 50, batch_upsert: int = 128):
-    client = connect()
-    ensure_collection(client) # BGE-M3 dense size
-
-    for aid in list_recent_arxiv_ids(max_results=max_results):
+def iter_paper_chunks(arxiv_ids: Iterable[str]) -> Iterator[Tuple[str, List[str], List[dict]]]:
+    """Fetch, parse, clean and chunk one paper at a time; yield (arxiv_id, texts, metas)."""
+    for aid in arxiv_ids:
         try:
             html = fetch_ar5iv_html(aid)
             sections = html_to_sections(html)
@@ -91,27 +91,94 @@ def run(max_results: int = 50, batch_upsert: int = 128):
                         "source_html": AR5IV_BASE + aid,
                         # Store under 'text' so the retriever can read it uniformly
                         "text": text,
+                        # Sentence spans + hashes so /ask doesn't re-split every passage
+                        **claim_candidates(text),
                     })
-
-
-            if not texts:
-                print(f"No text chunks for {aid}; skipping")
+        except Exception as e:
+            print("Skip", aid, "->", e)
+            continue
+
+        if not texts:
+            print(f"No text chunks for {aid}; skipping")
+            continue
+        yield aid, texts, metas
+        time.sleep(0.4) # delay
+
+
+def iter_points(papers: Iterable[Tuple[str, List[str], List[dict]]],
+                window: int) -> Iterator[Tuple[str, np.ndarray, dict]]:
+    """Embed chunks INGEST_WINDOW rows at a time across papers; yield (id, vector, payload).
+    Vectors are rows of a float32 array (no nested Python lists). At most one window plus
+    one paper's chunks is held here, so peak memory doesn't grow with the size of the run.
+    Prints per-paper progress once all of a paper's chunks have been handed to the uploader.
+    """
+    texts: List[str] = []
+    metas: List[dict] = []
+    progress: Dict[str, List[int]] = {}  # arxiv_id -> [chunks yielded, chunks total]
+
+    def drain(final: bool):
+        """Embed and yield full windows (and the remainder when final)."""
+        while texts and (len(texts) >= window or final):
+            w_texts, w_metas = texts[:window], metas[:window]
+            del texts[:window], metas[:window]
+            try:
+                vecs = embed_texts(w_texts, as_numpy=True)
+            except Exception as e:
+                # Drop the affected papers entirely, including rows still waiting in the buffer
+                failed = {m["arxiv_id"] for m in w_metas}
+                for a in failed:
+                    done, total = progress.pop(a)
+                    if done:
+                        print(f"Partially indexed {a}: {done}/{total} chunks uploaded before error ->", e)
+                    else:
+                        print("Skip", a, "->", e)
+                keep = [i for i, m in enumerate(metas) if m["arxiv_id"] not in failed]
+                texts[:] = [texts[i] for i in keep]
+                metas[:] = [metas[i] for i in keep]
                 continue
 
-            vecs = embed_texts(texts)
-            points = []
-            for i in range(len(texts)):
-                points.append(PointStruct(id=str(uuid.uuid4()), vector=vecs[i], payload=metas[i]))
+            for vec, meta in zip(vecs, w_metas):
+                yield str(uuid.uuid4()), vec, meta
+                a = meta["arxiv_id"]
+                progress[a][0] += 1
+                if progress[a][0] == progress[a][1]:
+                    print(f"Indexed {a} with {progress.pop(a)[1]} chunks")
+
+    for aid, p_texts, p_metas in papers:
+        texts.extend(p_texts)
+        metas.extend(p_metas)
+        progress[aid] = [0, len(p_texts)]
+        yield from drain(final=False)
+    yield from drain(final=True)
+
+
+def upload_papers(client, papers: Iterable[Tuple[str, List[str], List[dict]]],
+                  batch_size: int, parallel: int, window: int) -> None:
+    """Stream every paper's points into ONE upload_collection call.
+    A single call lets Qdrant's uploader keep `parallel` workers busy across papers
+    (a per-paper call would start a new worker pool for barely one batch).
+    """
+    ids, vectors, payload = tee(iter_points(papers, window), 3)
+    client.upload_collection(
+        collection_name=settings.COLLECTION_NAME,
+        vectors=(v for _, v, _ in vectors),
+        payload=(p for _, _, p in payload),
+        ids=(i for i, _, _ in ids),
+        batch_size=batch_size,
+        parallel=parallel,
+        wait=True,
+    )
+
+
+def run(max_results: int = 50, batch_upsert: Optional[int] = None, parallel: Optional[int] = None):
+    batch_upsert = batch_upsert or settings.UPLOAD_BATCH_SIZE
+    parallel = parallel or settings.UPLOAD_PARALLEL
+    window = max(settings.INGEST_WINDOW, batch_upsert)
+    client = connect()
+    ensure_collection(client) # BGE-M3 dense size
 
-            # Upsert in batches for large papers
-            for i in range(0, len(points), batch_upsert):
-                client.upsert(collection_name=settings.COLLECTION_NAME, points=points[i:i + batch_upsert])
-            print(f"Indexed {aid} with {len(points)} chunks")
-            time.sleep(0.4) # delay
-        except Exception as e:
-            print("Skip", aid, "->", e)
+    papers = iter_paper_chunks(list_recent_arxiv_ids(max_results=max_results))
+    upload_papers(client, papers, batch_upsert, parallel, window)
 
 if __name__ == "__main__":
     run(max_results=30)
-
-
@@ -0,0 +1,427 @@
+"""Load-test the /ask endpoint and report throughput, latency percentiles and per-stage timings.
+
+Two targets:
+  - in-process (default): drives server.app through httpx's ASGI transport. With --offline the
+    embedder, Qdrant and the LLM are replaced by local stand-ins, so no network or model download
+    is needed. Each stand-in can also be picked on its own (--hash-embedder, --local-qdrant /
+    --qdrant-path, --stub-llm); anything not replaced uses the configured backend.
+  - live: --url http://127.0.0.1:8000 hits a running uvicorn instance.
+
+Two load shapes:
+  - --concurrency N : N closed-loop workers, each sends its next request as soon as one returns.
+  - --rate R        : open-loop arrivals at R requests/second (latency includes queueing).
+
+Results are written as JSON (--out) so runs can be compared across commits (--compare old.json).
+
+Examples:
+  python loadtest.py --offline --concurrency 8 --requests 500 --out results.json
+  python loadtest.py --offline --rate 20 --duration 30 --llm-latency-ms 300 --compare results.json
+  python loadtest.py --url http://127.0.0.1:8000 --concurrency 4 --duration 60
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import types
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+STAGES = ("retrieve", "claims", "reflect", "answer")
+
+# Offline runs seed their own collection, so a real local index in --qdrant-path is never touched
+LOADTEST_COLLECTION_SUFFIX = "_loadtest"
+
+# Question mix: (weight, template). Templates are filled with a random topic.
+QUESTION_TEMPLATES = [
+    (4, "What is {}?"),
+    (3, "Explain the relation between {} and {}."),
+    (2, "State the main theorem about {}."),
+    (1, "Give an example where {} fails to be finitely generated."),
+]
+TOPICS = [
+    "the Picard group", "the Néron–Severi group", "the Mordell–Weil group", "étale cohomology",
+    "the Tate–Shafarevich group", "an abelian variety", "a modular form", "the Hodge conjecture",
+    "the Weil conjectures", "a Galois representation", "the Brauer group", "a K3 surface",
+    "the class group", "an elliptic curve over Q", "the Birch–Swinnerton-Dyer conjecture",
+    "a Shimura variety", "the Chow group", "a p-adic L-function",
+]
+
+
+def iter_questions(seed: int = 0, pool: Optional[List[str]] = None) -> Iterator[str]:
+    """Endless question stream, sampled from `pool` if given, else from the weighted template mix."""
+    rng = random.Random(seed)
+    templates = [t for _, t in QUESTION_TEMPLATES]
+    weights = [w for w, _ in QUESTION_TEMPLATES]
+    while True:
+        if pool:
+            yield rng.choice(pool)
+        else:
+            tpl = rng.choices(templates, weights=weights)[0]
+            yield tpl.format(*rng.sample(TOPICS, tpl.count("{}")))
+
+
+# -----------------------------
+# Offline stand-ins
+# -----------------------------
+
+def _install_hash_embedder(dim: int, latency_ms: float) -> None:
+    """Register a stand-in `embedder` module (feature-hashed bag of words, L2-normalised).
+    Must run before anything imports embedder, so the ONNX model is never loaded.
+    Sleeps synchronously to mimic the real embedder, which blocks the event loop.
+    """
+    import numpy as np
+
+    def _embed(texts: List[str], as_numpy: bool = False):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        out = np.zeros((len(texts), dim), dtype=np.float32)
+        for i, t in enumerate(texts):
+            for w in re.findall(r"\w+", t.lower()):
+                h = int.from_bytes(hashlib.blake2b(w.encode(), digest_size=8).digest(), "little")
+                out[i, h % dim] += 1.0 if (h >> 63) else -1.0
+        out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out if as_numpy else out.tolist()
+
+    mod = types.ModuleType("embedder")
+    mod.BACKEND = "hash"
+    mod.EMBED_DIM = dim
+    mod.embed_texts = _embed
+    mod.embed_queries = _embed
+    sys.modules["embedder"] = mod
+
+
+def _seed_corpus(client, n: int, seed: int) -> None:
+    """Fill the stand-in collection with n synthetic passages shaped like ingest_math payloads.
+    Seeds (and recreates) settings.COLLECTION_NAME, which build_app points at the
+    load-test-only collection beforehand.
+    """
+    from qdrant_client.models import PointStruct
+    from settings import settings
+    from db_qdrant import ensure_collection
+    from embedder import embed_texts
+    from claims import claim_candidates
+
+    rng = random.Random(seed)
+    ensure_collection(client)
+    texts, metas = [], []
+    for i in range(n):
+        a, b = rng.sample(TOPICS, 2)
+        aid = f"2508.{10000 + i // 20:05d}"
+        text = (
+            f"Theorem {i % 7 + 1}. Let X be a smooth projective variety; then {a} is related to {b}. "
+            f"Proof. This follows from the comparison between {a} and {b} in Section {i % 5 + 1}. "
+            f"We recall that {b} is defined in terms of {rng.choice(TOPICS)}."
+        )
+        texts.append(text)
+        metas.append({"arxiv_id": aid, "section": f"{i % 5 + 1} Main results",
+                      "source_html": f"https://ar5iv.org/html/{aid}", "text": text,
+                      **claim_candidates(text)})
+    vecs = embed_texts(texts)
+    for i in range(0, n, 256):
+        client.upsert(
+            collection_name=settings.COLLECTION_NAME,
+            points=[PointStruct(id=str(uuid.uuid4()), vector=vecs[j], payload=metas[j])
+                    for j in range(i, min(i + 256, n))],
+        )
+
+
+def _install_stub_llm(latency_ms: float) -> None:
+    """Turn on the LLM code paths in answerer/reflect, backed by canned responses.
+    Sleeps synchronously, like the real OpenAI client called inside llm.chat().
+    """
+    import answerer
+    import reflect
+    from prompts import ANSWER_COMPOSER, REFLECT_2HOP
+
+    async def chat(messages, **kwargs):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return "Stub answer. " + messages[-1]["content"][:200]
+
+    async def chat_json(messages, **kwargs):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return ["stub follow-up 1", "stub follow-up 2"]
+
+    answerer.USE_LLM, answerer.chat, answerer.ANSWER_COMPOSER = True, chat, ANSWER_COMPOSER
+    reflect.USE_LLM, reflect.chat_json, reflect.REFLECT_2HOP = True, chat_json, REFLECT_2HOP
+
+
+def build_app(args):
+    """Import server.app with the requested stand-ins; everything else stays as configured."""
+    if args.hash_embedder:
+        _install_hash_embedder(args.embed_dim, args.embed_latency_ms)
+    if args.local_qdrant:
+        from qdrant_client import QdrantClient
+        from settings import settings
+        import retrieval
+
+        # retrieval reads settings.COLLECTION_NAME per request, so this redirects the whole app
+        settings.COLLECTION_NAME += LOADTEST_COLLECTION_SUFFIX
+        client = QdrantClient(path=args.qdrant_path) if args.qdrant_path else QdrantClient(location=":memory:")
+        _seed_corpus(client, args.corpus_size, args.seed)
+        retrieval.connect = lambda: client
+    if args.stub_llm:
+        _install_stub_llm(args.llm_latency_ms)
+    from server import app
+    return app
+
+
+def target_label(args) -> str:
+    """Describe what the run actually hit, e.g. 'in-process (hash-embedder, qdrant:./qd, stub-llm)'."""
+    if args.url:
+        return args.url
+    parts = []
+    if args.hash_embedder:
+        parts.append("hash-embedder")
+    if args.local_qdrant:
+        parts.append(f"qdrant:{args.qdrant_path}" if args.qdrant_path else "qdrant:memory")
+    if args.stub_llm:
+        parts.append("stub-llm")
+    return "in-process" + (f" ({', '.join(parts)})" if parts else "")
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """'retrieve;dur=12.5, claims;dur=0.3' -> {'retrieve': 12.5, 'claims': 0.3} (milliseconds)."""
+    out: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        m = re.search(r"dur=([0-9.]+)", params)
+        if name and m:
+            out[name] = float(m.group(1))
+    return out
+
+
+async def _one(client, question: str, top_k: int, scheduled: float, results: List[Dict]) -> None:
+    rec = {"ok": False, "stages": {}}
+    try:
+        r = await client.post("/ask", json={"question": question, "top_k": top_k})
+        rec["status"] = r.status_code
+        rec["ok"] = r.status_code == 200
+        rec["stages"] = parse_server_timing(r.headers.get("server-timing", ""))
+    except Exception as e:
+        rec["status"] = 0
+        rec["error"] = f"{type(e).__name__}: {e}"
+    rec["latency_ms"] = (time.perf_counter() - scheduled) * 1000
+    results.append(rec)
+
+
+async def drive(client, questions: Iterator[str], args) -> Dict:
+    """Send questions at a fixed concurrency or arrival rate; stop at --duration if set."""
+    results: List[Dict] = []
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else None
+    it = questions  # shared by all workers; safe since everything runs on one event loop
+
+    if args.rate:
+        tasks = []
+        for i, q in enumerate(it):
+            at = start + i / args.rate
+            if deadline and at >= deadline:
+                break
+            await asyncio.sleep(max(0.0, at - time.perf_counter()))
+            tasks.append(asyncio.create_task(_one(client, q, args.top_k, at, results)))
+        await asyncio.gather(*tasks)
+    else:
+        async def worker():
+            for q in it:
+                if deadline and time.perf_counter() >= deadline:
+                    return
+                await _one(client, q, args.top_k, time.perf_counter(), results)
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    return {"results": results, "elapsed_s": time.perf_counter() - start}
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = max(0, min(len(s) - 1, math.ceil(q / 100 * len(s)) - 1))
+    return s[k]
+
+
+def latency_stats(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3) if values else 0.0,
+    }
+
+
+def summarize(results: List[Dict], elapsed_s: float) -> Dict:
+    ok = [r for r in results if r["ok"]]
+    n = len(results)
+    stages = {}
+    for name in STAGES:
+        vals = [r["stages"][name] for r in ok if name in r["stages"]]
+        if vals:
+            stages[name] = latency_stats(vals)
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            key = r.get("error") or f"HTTP {r['status']}"
+            errors[key] = errors.get(key, 0) + 1
+    return {
+        "requests": n,
+        "errors": n - len(ok),
+        "error_rate": round((n - len(ok)) / n, 4) if n else 0.0,
+        "duration_s": round(elapsed_s, 3),
+        "throughput_rps": round(len(ok) / elapsed_s, 3) if elapsed_s else 0.0,
+        "latency_ms": latency_stats([r["latency_ms"] for r in ok]),
+        "stages_ms": stages,
+        "error_kinds": errors,
+    }
+
+
+def report_config(args) -> Dict:
+    """Requested settings only (the achieved request count lives in the summary), so reports
+    from different commits line up key for key. --rate runs have no concurrency setting."""
+    skip = {"out", "compare"} | ({"concurrency"} if args.rate else set())
+    return {k: v for k, v in vars(args).items() if k not in skip}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    s = report["summary"]
+    b = baseline["summary"] if baseline else None
+
+    def delta(cur, old, label=""):
+        if old in (None, 0):
+            return ""
+        return f"  ({(cur - old) / old * 100:+.1f}%{label} vs {baseline['meta']['commit']})"
+
+    print(f"commit {report['meta']['commit']}  target {report['meta']['target']}")
+    print(f"requests {s['requests']}  errors {s['errors']} ({s['error_rate'] * 100:.2f}%)  "
+          f"duration {s['duration_s']:.1f}s")
+    print(f"throughput {s['throughput_rps']:.2f} req/s" + delta(s["throughput_rps"], b and b["throughput_rps"]))
+    print(f"{'':10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    rows = [("total", s["latency_ms"], b and b["latency_ms"])]
+    rows += [(k, v, b and b["stages_ms"].get(k)) for k, v in s["stages_ms"].items()]
+    for name, st, old in rows:
+        line = f"{name:10}{st['p50']:>10.2f}{st['p95']:>10.2f}{st['p99']:>10.2f}"
+        print(line + (delta(st["p95"], old["p95"], " p95") if old else ""))
+    for kind, count in s["error_kinds"].items():
+        print(f"  error x{count}: {kind}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--url", help="base URL of a running server; default drives server.app in-process")
+    load = ap.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=4, help="closed-loop workers (default 4)")
+    load.add_argument("--rate", type=float, help="open-loop arrival rate in requests/second")
+    ap.add_argument("--requests", type=int,
+                    help="total requests to send (default 200, or unlimited when --duration is set)")
+    ap.add_argument("--duration", type=float, help="stop issuing requests after this many seconds")
+    ap.add_argument("--top-k", type=int, default=8)
+    ap.add_argument("--questions", help="file with one question per line (default: built-in math mix)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+
+    off = ap.add_argument_group("offline stand-ins (in-process only)")
+    off.add_argument("--offline", action="store_true",
+                     help="shorthand for --hash-embedder --local-qdrant --stub-llm")
+    off.add_argument("--hash-embedder", action="store_true", help="replace the ONNX/OpenAI embedder")
+    off.add_argument("--local-qdrant", action="store_true",
+                     help="replace the configured Qdrant with an in-memory one seeded with a synthetic "
+                          "corpus (embedded with whichever embedder is active)")
+    off.add_argument("--qdrant-path",
+                     help="like --local-qdrant but on disk in this folder; the synthetic corpus is "
+                          "(re)created in a separate '<COLLECTION_NAME>_loadtest' collection, "
+                          "existing collections are left untouched")
+    off.add_argument("--stub-llm", action="store_true",
+                     help="enable the LLM path with canned responses (retrieval is unchanged)")
+    off.add_argument("--corpus-size", type=int, default=2000, help="synthetic passages to index")
+    off.add_argument("--embed-dim", type=int, default=1024)
+    off.add_argument("--embed-latency-ms", type=float, default=0.0, help="simulated embed time per call")
+    off.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated LLM time per call")
+
+    ap.add_argument("--out", help="write the JSON report here")
+    ap.add_argument("--compare", help="previous JSON report to diff against")
+    args = ap.parse_args(argv)
+    if args.url and (args.offline or args.hash_embedder or args.local_qdrant
+                     or args.qdrant_path or args.stub_llm):
+        ap.error("--url targets a live server; --offline/--hash-embedder/--local-qdrant/"
+                 "--qdrant-path/--stub-llm only apply to in-process runs")
+    if args.offline:
+        args.hash_embedder = args.local_qdrant = args.stub_llm = True
+    if args.qdrant_path:
+        args.local_qdrant = True
+    if args.requests is None and not args.duration:
+        args.requests = 200
+
+    pool = None
+    if args.questions:
+        with open(args.questions, encoding="utf-8") as f:
+            pool = [line.strip() for line in f if line.strip()]
+    questions = itertools.islice(iter_questions(seed=args.seed, pool=pool), args.requests)
+
+    import httpx
+    target = target_label(args)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        app = build_app(args)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   timeout=args.timeout)
+
+    async def _run():
+        async with client:
+            return await drive(client, questions, args)
+
+    run = asyncio.run(_run())
+    config = report_config(args)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": target,
+            "config": config,
+        },
+        "summary": summarize(run["results"], run["elapsed_s"]),  # "requests" = achieved count
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
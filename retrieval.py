@@ -6,7 +6,8 @@ from embedder import embed_queries  # <- use the query encoder (adds "query: " p
 async def retrieve_passages(query: str, limit: int = 20) -> List[Dict]:
     """
     Embed query, search Qdrant, return normalised passages dicts with text.
-    Each item: {"text","arxiv_id","section","source_html","score"}.
+    Each item: {"text","arxiv_id","section","source_html","score"},
+    plus "claim_spans"/"claim_hashes" when the payload has them.
     """
     client = connect()
 
@@ -26,13 +27,18 @@ async def retrieve_passages(query: str, limit: int = 20) -> List[Dict]:
     for h in hits:
         p = h.payload or {}
         text = p.get("text") or p.get("chunk_text") or ""
-        out.append({
+        item = {
             "score": h.score,
             "text": text,
             "arxiv_id": p.get("arxiv_id", ""),
             "section": p.get("section", ""),
             "source_html": p.get("source_html", ""),
-        })
+        }
+        # Precomputed claim candidates (see claims.claim_candidates); absent on older ingests
+        if "claim_spans" in p and "claim_hashes" in p:
+            item["claim_spans"] = p["claim_spans"]
+            item["claim_hashes"] = p["claim_hashes"]
+        out.append(item)
     return out
 
 
@@ -1,8 +1,9 @@
 # server.py
 # FastAPI app wiring together retrieval -> claims -> answer.
 
+import time
 from typing import List, Dict
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 
 from retrieval import retrieve_passages          # async
@@ -12,6 +13,10 @@ from reflect import reflect_two_hop              # async, no-ops when USE_LLM=fa
 
 app = FastAPI(title="Math ArXiv Bot", version="0.1")
 
+# Documented keys of each item in the /ask "passages" list; anything else retrieval
+# attaches (e.g. precomputed claim spans/hashes) is internal and not returned.
+PASSAGE_KEYS = ("score", "text", "arxiv_id", "section", "source_html")
+
 class AskPayload(BaseModel):
     question: str
     top_k: int = 8
@@ -21,30 +26,45 @@ async def health():
     return {"status": "ok"}
 
 @app.post("/ask")
-async def ask(payload: AskPayload):
+async def ask(payload: AskPayload, response: Response):
     """
     1) embed & search (Qdrant)
     2) turn top passages into short claims (no-LLM baseline)
     3) (optional) reflect to produce follow-up queries (no-op in local mode)
     4) compose final answer (no-LLM baseline unless USE_LLM=true)
+    Per-stage durations are reported in the Server-Timing header (used by loadtest.py).
     """
     try:
+        timings: Dict[str, float] = {}
+        t0 = time.perf_counter()
+
         # 1) retrieval
         passages: List[Dict] = await retrieve_passages(payload.question, limit=payload.top_k)
+        t1 = time.perf_counter()
+        timings["retrieve"] = t1 - t0
 
         # 2) claims
         claims: List[Dict] = await extract_claims(payload.question, passages)
+        t2 = time.perf_counter()
+        timings["claims"] = t2 - t1
 
         # 3) (optional) reflection
         followups: List[str] = await reflect_two_hop(payload.question, claims)
+        t3 = time.perf_counter()
+        timings["reflect"] = t3 - t2
 
         # 4) compose final answer
         answer: str = await compose_answer(payload.question, claims)
+        timings["answer"] = time.perf_counter() - t3
+
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={secs * 1000:.3f}" for name, secs in timings.items()
+        )
 
         return {
             "answer": answer,
             "claims": claims,
-            "passages": passages,
+            "passages": [{k: p.get(k) for k in PASSAGE_KEYS} for p in passages],
             "followups": followups,
         }
     except Exception as e:
@@ -4,11 +4,19 @@ from typing import Optional
 class Settings(BaseSettings):
     OPENAI_API_KEY: str = "sk-"
     QDRANT_URL: str = "http://localhost:6333"
+    QDRANT_PREFER_GRPC: bool = False    # use gRPC (port 6334) for uploads/search when available
+    QDRANT_GRPC_PORT: int = 6334
     COLLECTION_NAME: str = "math_arxiv_passages"
     EMBED_MODEL: str = "BAAI/bge-m3"
     LLM_MODEL: str = "gpt-4o-mini"
     LLM_TEMPERATURE: float = 0.0
 
+    # Bulk ingest: papers are streamed through one upload; chunks are embedded INGEST_WINDOW
+    # at a time, so peak memory is about one window plus one paper, whatever the run size.
+    UPLOAD_BATCH_SIZE: int = 128
+    UPLOAD_PARALLEL: int = 1
+    INGEST_WINDOW: int = 1024
+
     # pydantic-settings to load .env automatically
     model_config = SettingsConfigDict(
         env_file=".env",
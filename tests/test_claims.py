@@ -0,0 +1,35 @@
+import asyncio
+import re
+from claims import extract_claims, claim_candidates
+
+TEXT = "  The Picard group is finitely generated.  Hence NS(X) is too!\nProof. Omitted. "
+
+def _baseline_first_sentences(text, max_sents=2):
+    # The pre-ingest splitter from claims.py, kept here as the reference behaviour
+    parts = re.split(r"(?<=[\.\?\!])\s+", text.strip())
+    parts = [p.strip() for p in parts if p.strip()]
+    return parts[:max_sents] or ([text.strip()] if text.strip() else [])
+
+def test_candidates_match_baseline_splitter():
+    for text in [TEXT, "no sentence break here ", "   ", "", "One. ", "A? B! C. D"]:
+        cand = claim_candidates(text)
+        assert [text[s:e] for s, e in cand["claim_spans"]] == _baseline_first_sentences(text)
+        assert len(cand["claim_hashes"]) == len(cand["claim_spans"])
+    assert [TEXT[s:e] for s, e in claim_candidates(TEXT)["claim_spans"]] == [
+        "The Picard group is finitely generated.", "Hence NS(X) is too!"]
+
+def test_precomputed_and_legacy_payloads_agree():
+    legacy = [{"text": TEXT, "arxiv_id": "2508.00001", "section": "1"}] * 2
+    stored = [dict(p, **claim_candidates(p["text"])) for p in legacy]
+    a = asyncio.run(extract_claims("q", legacy))
+    b = asyncio.run(extract_claims("q", stored))
+    assert a == b and len(a) == 2  # duplicate passage is deduped
+
+def test_bad_stored_spans_fall_back():
+    p = {"text": TEXT, "arxiv_id": "2508.00001", "section": "1"}
+    expected = asyncio.run(extract_claims("q", [p]))
+    for spans in ([[0, 500], [3, 3]], [[0, 1, 2], [2, 5]], [[0, "5"], [2, 5]], [7, 9], [[0.0, 5], [2, 5]]):
+        stale = dict(p, claim_spans=spans, claim_hashes=["x", "y"])
+        claims = asyncio.run(extract_claims("q", [stale]))
+        assert claims == expected
+        assert all(c["claim"] for c in claims)
@@ -10,3 +10,9 @@ def test_embed_shape():
     assert isinstance(vecs[0][0], float)
 
 
+def test_embed_numpy():
+    import numpy as np
+    vecs = embed_texts(["Picard group of a smooth projective variety"], as_numpy=True)
+    assert isinstance(vecs, np.ndarray)
+    assert vecs.shape == (1, EMBED_DIM)
+    assert vecs.dtype == np.float32
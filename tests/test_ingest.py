@@ -0,0 +1,39 @@
+import numpy as np
+import ingest_math
+
+
+class _StubClient:
+    def __init__(self):
+        self.calls = []
+
+    def upload_collection(self, collection_name, vectors, payload, ids, **kwargs):
+        # Consume the streams the way the uploader does: in lockstep
+        self.calls.append(list(zip(ids, vectors, payload)))
+
+
+def _paper(aid, n):
+    texts = [f"{aid}-{i}" for i in range(n)]
+    return aid, texts, [{"arxiv_id": aid, "text": t} for t in texts]
+
+
+def test_upload_papers_single_call_across_windows(monkeypatch):
+    windows = []
+
+    def fake_embed(texts, as_numpy=False):
+        windows.append(len(texts))
+        # Vector encodes its own text so it can be matched back to its payload
+        return np.array([[float(hash(t) % 1000)] for t in texts], dtype=np.float32)
+
+    monkeypatch.setattr(ingest_math, "embed_texts", fake_embed)
+    papers = [_paper("a", 3), _paper("b", 1), _paper("c", 4)]
+    client = _StubClient()
+
+    ingest_math.upload_papers(client, iter(papers), batch_size=2, parallel=2, window=3)
+
+    assert len(client.calls) == 1  # one upload for the whole run
+    rows = client.calls[0]
+    assert windows == [3, 3, 2]   # embedded in windows spanning papers
+    assert [p["text"] for _, _, p in rows] == [t for _, texts, _ in papers for t in texts]
+    for _, v, p in rows:
+        assert v[0] == float(hash(p["text"]) % 1000)
+    assert len({i for i, _, _ in rows}) == 8
@@ -0,0 +1,36 @@
+import argparse
+from loadtest import parse_server_timing, percentile, summarize, target_label, report_config
+
+def test_parse_server_timing():
+    t = parse_server_timing("retrieve;dur=12.5, claims;dur=0.250, answer;dur=3")
+    assert t == {"retrieve": 12.5, "claims": 0.25, "answer": 3.0}
+    assert parse_server_timing("") == {}
+
+def test_summarize_percentiles_and_errors():
+    assert percentile(list(range(1, 101)), 95) == 95
+    results = [{"ok": True, "status": 200, "latency_ms": float(i), "stages": {"retrieve": i / 2}}
+               for i in range(1, 100)]
+    results.append({"ok": False, "status": 500, "latency_ms": 1.0, "stages": {}})
+    s = summarize(results, elapsed_s=2.0)
+    assert s["requests"] == 100 and s["errors"] == 1
+    assert s["error_rate"] == 0.01
+    assert s["latency_ms"]["p50"] == 50.0
+    assert s["stages_ms"]["retrieve"]["p50"] == 25.0
+    assert s["error_kinds"] == {"HTTP 500": 1}
+
+def _args(**kw):
+    base = dict(url=None, hash_embedder=False, local_qdrant=False, qdrant_path=None, stub_llm=False,
+                rate=None, concurrency=4, requests=200, out=None, compare=None)
+    base.update(kw)
+    return argparse.Namespace(**base)
+
+def test_target_label_reflects_stand_ins():
+    assert target_label(_args()) == "in-process"
+    assert target_label(_args(stub_llm=True)) == "in-process (stub-llm)"
+    assert target_label(_args(local_qdrant=True, qdrant_path="qd")) == "in-process (qdrant:qd)"
+    assert target_label(_args(url="http://h")) == "http://h"
+
+def test_report_config_keeps_requested_values():
+    cfg = report_config(_args(rate=5.0, requests=300, out="x.json"))
+    assert cfg["requests"] == 300 and "concurrency" not in cfg and "out" not in cfg
+    assert report_config(_args())["concurrency"] == 4
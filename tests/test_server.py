@@ -0,0 +1,18 @@
+import asyncio
+from fastapi import Response
+import server
+
+
+def test_ask_passages_only_documented_keys(monkeypatch):
+    async def fake_retrieve(question, limit=8):
+        return [{
+            "score": 0.5, "text": "The Picard group is finitely generated.", "arxiv_id": "2508.00001",
+            "section": "1", "source_html": "https://ar5iv.org/html/2508.00001",
+            "claim_spans": [[0, 39]], "claim_hashes": ["0123456789abcdef"],
+        }]
+    monkeypatch.setattr(server, "retrieve_passages", fake_retrieve)
+
+    out = asyncio.run(server.ask(server.AskPayload(question="What is the Picard group?"), Response()))
+    assert out["passages"]
+    for p in out["passages"]:
+        assert set(p) == {"score", "text", "arxiv_id", "section", "source_html"}